@@ -3,6 +3,7 @@
 """
 ANSI terminal cursor and key utilities.
 """
+import os
 import sys
 import re
 from typing import Callable
@@ -13,19 +14,88 @@ ANSI_KEY_RIGHT = b"\x1b[C"
 ANSI_KEY_LEFT = b"\x1b[D"
 ANSI_KEY_EOX = b"\x03"
 
+_CPR_RE = re.compile(rb"\x1b\[(\d+);(\d+)R")
+
+# Pending output for the current frame; written out at once by flush().
+_buf = bytearray()
+_append = _buf.extend
+
+# Bound on first use so the render path skips the sys.stdout attribute
+# lookups; resolved lazily since sys.stdout may lack .buffer (or be None).
+_write: Callable[[bytes | bytearray], object] | None = None
+_flush: Callable[[], None] = lambda: None
+_stream = None
+
+# Descriptor flush() writes to directly while the terminal is in raw mode.
+_raw_fd: int | None = None
+
+
+def rebind_stdout() -> None:
+    """Re-bind the cached writers after sys.stdout has been replaced."""
+    global _write, _flush, _stream
+    stream = _stream = sys.stdout
+    buffer = getattr(stream, "buffer", None)
+    if buffer is not None:
+        _write = buffer.write
+    else:
+        # Text-only streams such as io.StringIO.
+        def write_text(b: bytes | bytearray) -> None:
+            stream.write(b.decode())
+
+        _write = write_text
+    _flush = stream.flush
+
+
+def set_raw_output(enabled: bool) -> None:
+    """Send flushed frames straight to stdout's descriptor while enabled,
+    bypassing the text layer's encoder and buffering.
+    """
+    global _raw_fd
+    if enabled:
+        if _write is None:
+            rebind_stdout()
+        _flush()
+        try:
+            _raw_fd = _stream.fileno()
+        except OSError:  # includes io.UnsupportedOperation
+            # No descriptor (e.g. io.StringIO); keep the buffered path.
+            _raw_fd = None
+    else:
+        _raw_fd = None
+
+
+def emit(b: bytes) -> None:
+    """Queue encoded b for output on the next flush()."""
+    _append(b)
+
+
+def flush() -> None:
+    """Write all queued output with a single write and flush stdout."""
+    if _raw_fd is None:
+        if _write is None:
+            rebind_stdout()
+        # Drain any text already buffered by print() ahead of this frame.
+        _flush()
+        _write(_buf)
+        _flush()
+        _buf.clear()
+    else:
+        # Normally one write; drop whatever a short write did send and retry.
+        while _buf:
+            del _buf[:os.write(_raw_fd, _buf)]
+
 
 def get_cursor_position():
     """Get current cursor position"""
-    sys.stdout.write(f"\x1b[6n")
-    sys.stdout.flush()
+    emit(b"\x1b[6n")
+    flush()
 
-    buf = ""
-    while (ch := sys.stdin.read(1)) != "R":
+    buf = bytearray()
+    while (ch := sys.stdin.buffer.read(1)) and ch != b"R":
         buf += ch
-    buf += "R"
+    buf += b"R"
 
-    m = re.search(r"\x1b\[(\d+);(\d+)R", buf)
-    sys.stdout.flush()
+    m = _CPR_RE.search(buf)
     return tuple(map(int, m.groups())) if m else None
 
 
@@ -33,63 +103,59 @@ def cursor_up(dist: int):
     """Move cursor up by dist rows. No-op when dist <= 0."""
     if dist == 0:
         return
-    sys.stdout.write(f"\x1b[{dist}A")
+    emit(b"\x1b[%dA" % dist)
 
 
 def cursor_down(dist: int):
     """Move cursor down by dist rows. No-op when dist <= 0."""
     if dist == 0:
         return
-    sys.stdout.write(f"\x1b[{dist}B")
+    emit(b"\x1b[%dB" % dist)
 
 
 def cursor_right(dist: int):
     """Move cursor right by dist rows. No-op when dist <= 0."""
     if dist == 0:
         return
-    sys.stdout.write(f"\x1b[{dist}C")
+    emit(b"\x1b[%dC" % dist)
 
 
 def cursor_left(dist: int):
     """Move cursor left by dist rows. No-op when dist <= 0."""
     if dist == 0:
         return
-    sys.stdout.write(f"\x1b[{dist}D")
+    emit(b"\x1b[%dD" % dist)
 
 
-def move_cursor_by_relative_pos_row(relative_pos_row: int) -> Callable[[], None]:
-    """Move rows relative to current position and return a restoration callable.
-    If relative_pos_row == 0, nothing is moved and a no-op restore is returned.
+def move_cursor_by_relative_pos_row(relative_pos_row: int) -> int:
+    """Move rows relative to current position and return the row delta that
+    moves back. If relative_pos_row == 0, nothing is moved and 0 is returned.
     """
-    if relative_pos_row == 0:
-        return lambda: None
-
-    dist = abs(relative_pos_row)
     if relative_pos_row > 0:
-        cursor_down(dist)
-        return lambda: cursor_up(dist)
-    cursor_up(dist)
-    return lambda: cursor_down(dist)
+        cursor_down(relative_pos_row)
+    elif relative_pos_row < 0:
+        cursor_up(-relative_pos_row)
+    return -relative_pos_row
 
 
 def set_cursor_visibility(is_visible: bool) -> None:
-    sys.stdout.write("\x1b[?25h" if is_visible else "\x1b[?25l")
+    emit(b"\x1b[?25h" if is_visible else b"\x1b[?25l")
 
 
 def erase_line(col_offset: int) -> None:
-    sys.stdout.write("\x1b[2K")
-    set_col_offset(col_offset)
+    emit(b"\x1b[2K" + col_offset_escape(col_offset))
 
 
 def enable_autowrap(enabled: bool) -> None:
-    sys.stdout.write("\x1b[?7h" if enabled else "\x1b[?7l")
+    emit(b"\x1b[?7h" if enabled else b"\x1b[?7l")
 
 
-def set_col_offset(offset: int) -> None:
+def col_offset_escape(offset: int) -> bytes:
+    """Escape sequence that moves the cursor to column offset."""
     if offset < 0:
         offset = 0
-    sys.stdout.write(f"\x1b[{offset}G")
+    return b"\x1b[%dG" % offset
 
 
-def is_ansi_key(target: bytes) -> bool:
-    return target == b"\x1b"
+def set_col_offset(offset: int) -> None:
+    emit(col_offset_escape(offset))
@@ -35,7 +35,7 @@ install_options_list = [
     "Construct Home",
 ]
 
-install_options_mutex = {
-    frozenset({0, 2}),
-    frozenset({1, 3})
-}
+install_options_mutex = [
+    (0, 2),
+    (1, 3),
+]
@@ -4,19 +4,61 @@ Selman: interactive selection manager.
 - Preserves behavior and key bindings.
 - Minor cleanups, explicit typing, small safety improvements.
 """
+import os
+import select
+import shutil
 import sys
 import termios
 import tty
-from typing import List, Optional
+from typing import Iterable, List, Optional
 
 from selman.printer import (
-    print_unfocused,
     write_line,
     print_text_effect,
     TextEffect,
+    PREFIX,
+    SUFFIX,
 )
 from selman import ansi_control
 
+# How long to wait for the rest of an escape sequence split across reads.
+ESCAPE_TIMEOUT = 0.05
+
+
+def _raw_attrs(base: list) -> list:
+    """Return attributes equivalent to tty.setraw() applied to base.
+    Reads return as soon as one byte is available (VMIN=1, VTIME=0);
+    split escape sequences are completed by _read_keys().
+    """
+    attrs = base[:]
+    attrs[tty.IFLAG] &= ~(
+        termios.BRKINT | termios.ICRNL | termios.INPCK | termios.ISTRIP | termios.IXON
+    )
+    attrs[tty.OFLAG] &= ~termios.OPOST
+    attrs[tty.CFLAG] &= ~(termios.CSIZE | termios.PARENB)
+    attrs[tty.CFLAG] |= termios.CS8
+    attrs[tty.LFLAG] &= ~(
+        termios.ECHO | termios.ICANON | termios.IEXTEN | termios.ISIG
+    )
+    attrs[tty.CC] = attrs[tty.CC][:]
+    attrs[tty.CC][termios.VMIN] = 1
+    attrs[tty.CC][termios.VTIME] = 0
+    return attrs
+
+
+def _read_keys(fd: int) -> bytes:
+    """Read whatever keys are pending on fd, blocking for at least one byte.
+    A trailing partial escape sequence is completed if the rest arrives
+    within ESCAPE_TIMEOUT, so a lone Esc press never blocks.
+    """
+    chunk = os.read(fd, 8)
+    while chunk[-1:] == b"\x1b" or chunk[-2:] == b"\x1b[":
+        ready, _, _ = select.select([fd], [], [], ESCAPE_TIMEOUT)
+        if not ready:
+            break
+        chunk += os.read(fd, 8)
+    return chunk
+
 
 class Selman:
     def __init__(
@@ -24,39 +66,45 @@ class Selman:
         selection: List[str],
         col_offset: int = 0,
         allow_multiple_selection: bool = False,
-        mutex_group: Optional[set[frozenset]] = None,
+        mutex_group: Optional[Iterable[tuple[int, int]]] = None,
         footer_comments: Optional[List[str]] = None,
         wipe_comments_after_select: bool = True,
     ):
         self.selection = selection
+        self._selection_bytes = [item.encode("utf-8") for item in selection]
         self.col_offset = col_offset
-        self.mutex_group = mutex_group
+        # _opposite[i] is the index mutually exclusive with i, if any.
+        self._opposite: List[Optional[int]] = [None] * len(selection)
+        if mutex_group is not None:
+            for a, b in mutex_group:
+                self._opposite[a] = b
+                self._opposite[b] = a
         self.allow_multiple_selection = allow_multiple_selection
         self.footer_comments = footer_comments
         self.wipe_comments_after_select = wipe_comments_after_select
 
         self.current_index = 0
 
-        self.key_events = {
-            # next option keys
-            b"j": lambda: self.change_focus(1),
-            ansi_control.ANSI_KEY_DOWN: lambda: self.change_focus(1),
-            # previous option keys
-            b"k": lambda: self.change_focus(-1),
-            ansi_control.ANSI_KEY_UP: lambda: self.change_focus(-1),
-            # select
-            b"\r": self.select_option,
-            b"\n": self.select_option,
-            # proceed
-            b"n": self.proceed,
-            # exit
-            b"q": self.terminate,
-            ansi_control.ANSI_KEY_EOX: self.terminate,
+        # Bit i is set when selection[i] is selected / banned.
+        self._sel_mask = 0
+        self._banned_mask = 0
+        self._terminate = False
+        # Effect currently on screen for each line, to skip identical redraws.
+        self._drawn = [TextEffect.UNFOCUSED] * len(selection)
+
+    @property
+    def sel_board(self) -> dict[str, bool]:
+        return {
+            item: bool((self._sel_mask >> i) & 1)
+            for i, item in enumerate(self.selection)
         }
 
-        self.sel_board = {item: False for item in selection}
-        self.banned_board = {item: False for item in selection}
-        self._terminate = False
+    @property
+    def banned_board(self) -> dict[str, bool]:
+        return {
+            item: bool((self._banned_mask >> i) & 1)
+            for i, item in enumerate(self.selection)
+        }
 
     def terminate(self) -> None:
         self._terminate = True
@@ -68,7 +116,7 @@ class Selman:
         for c in self.footer_comments:
             ansi_control.set_col_offset(self.col_offset)
             write_line(c)
-            print()
+            ansi_control.emit(b"\n")
 
     def wipe_comments(self) -> None:
         if self.footer_comments is None:
@@ -77,11 +125,8 @@ class Selman:
         try:
             ansi_control.cursor_down(dist)
             ansi_control.erase_line(self.col_offset)
-            sys.stdout.flush()
         finally:
             ansi_control.cursor_up(dist)
-            sys.stdout.flush()
-        sys.stdout.flush()
 
     def run(self) -> str | None:
         """
@@ -89,21 +134,32 @@ class Selman:
         returns name of single selection if allow_multilple_selection is False
         returns None if allow_multilple_selection is True, the result stores in sel_board
         """
-        for i in range(len(self.selection)):
-            ansi_control.set_col_offset(self.col_offset)
-            print_unfocused(self.selection[i], self.col_offset)
-            print()
+        line_prefix = (
+            ansi_control.col_offset_escape(self.col_offset)
+            + PREFIX[TextEffect.UNFOCUSED]
+        )
+        line_suffix = SUFFIX[TextEffect.UNFOCUSED] + b"\n"
+        ansi_control.emit(
+            b"".join(line_prefix + item + line_suffix for item in self._selection_bytes)
+        )
+        ansi_control.flush()
+        # The repaint leaves every line unfocused with focus back on the first.
+        self._drawn = [TextEffect.UNFOCUSED] * len(self.selection)
+        self.current_index = 0
+        self._terminate = False
         return self.selman_mainstream()
 
     def selman_mainstream(self) -> str | None:
         fd = sys.stdin.fileno()
         old = termios.tcgetattr(fd)
+        disable_autowrap = self.max_line_width() > shutil.get_terminal_size().columns
         try:
-            tty.setraw(fd)
-            tty.setcbreak(fd)
+            termios.tcsetattr(fd, termios.TCSAFLUSH, _raw_attrs(old))
+            ansi_control.set_raw_output(True)
 
             ansi_control.set_cursor_visibility(False)
-            ansi_control.enable_autowrap(False)
+            if disable_autowrap:
+                ansi_control.enable_autowrap(False)
 
             if self.allow_multiple_selection:
                 ansi_control.set_col_offset(self.col_offset)
@@ -113,12 +169,12 @@ class Selman:
 
             self.initialize_focus()
 
-            sys.stdout.flush()
+            ansi_control.flush()
 
             while True:
-                key_bytes = sys.stdin.buffer.read(1)
+                key_bytes = _read_keys(fd)
                 last_selection = self.manage_key_input(key_bytes)
-                sys.stdout.flush()
+                ansi_control.flush()
 
                 if self._terminate:
                     break
@@ -131,25 +187,61 @@ class Selman:
             ansi_control.cursor_down(initial_cursor_relative_pos)
 
             termios.tcsetattr(fd, termios.TCSADRAIN, old)
+            ansi_control.set_raw_output(False)
 
             ansi_control.set_cursor_visibility(True)
-            ansi_control.enable_autowrap(True)
+            if disable_autowrap:
+                ansi_control.enable_autowrap(True)
 
-            print()
+            ansi_control.emit(b"\n")
+            ansi_control.flush()
 
         if self.allow_multiple_selection:
             return last_selection
         return None
 
-    def manage_key_input(self, k: bytes) -> str | None:
-        if ansi_control.is_ansi_key(k):
-            seq = sys.stdin.buffer.read(2)
-            k += seq
-        action = self.key_events.get(k)
-        if action:
-            return action()
+    def manage_key_input(self, keys: bytes) -> str | None:
+        """Handle every key in keys; returns the result of the last one."""
+        result = None
+        i = 0
+        while i < len(keys) and not self._terminate:
+            if keys[i:i + 2] == b"\x1b[":
+                k = keys[i:i + 3]
+            else:
+                k = keys[i:i + 1]
+            i += len(k)
+            result = self.handle_key(k)
+        return result
+
+    def handle_key(self, k: bytes) -> str | None:
+        match k:
+            # next option keys
+            case b"j" | ansi_control.ANSI_KEY_DOWN:
+                self.change_focus(1)
+            # previous option keys
+            case b"k" | ansi_control.ANSI_KEY_UP:
+                self.change_focus(-1)
+            # select
+            case b"\r" | b"\n":
+                return self.select_option()
+            # proceed
+            case b"n":
+                self.proceed()
+            # exit
+            case b"q" | ansi_control.ANSI_KEY_EOX:
+                self.terminate()
         return None
 
+    def max_line_width(self) -> int:
+        """Upper bound on the columns any drawn line reaches.
+        Encoded length is used since it is never below the display width.
+        """
+        # glyph and the space after it take 2 columns
+        widths = [len(item) + 2 for item in self._selection_bytes]
+        if self.footer_comments is not None:
+            widths.extend(len(c.encode()) for c in self.footer_comments)
+        return max(widths, default=0) + self.col_offset
+
     def get_relative_pos_by_index(self, index: int) -> int:
         return index - self.current_index
 
@@ -165,14 +257,11 @@ class Selman:
 
         self.render_text_effect(TextEffect.FOCUSED)
 
-    def is_index_valid(self, target_index: int) -> bool:
-        return 0 <= target_index < len(self.selection)
-
     def is_index_selected(self, target_index: int) -> bool:
-        return self.sel_board[self.selection[target_index]]
+        return (self._sel_mask >> target_index) & 1 == 1
 
     def is_index_banned(self, target_index: int) -> bool:
-        return self.banned_board[self.selection[target_index]]
+        return (self._banned_mask >> target_index) & 1 == 1
 
     def set_to_focused(self, target_index: int) -> None:
         if self.is_index_selected(target_index):
@@ -192,7 +281,7 @@ class Selman:
 
     def change_focus(self, relative_move: int) -> None:
         target = self.current_index + relative_move
-        if not (0 <= target < len(self.selection)):
+        if relative_move == 0 or not (0 <= target < len(self.selection)):
             return
 
         self.set_to_unfocused(self.current_index)
@@ -201,74 +290,65 @@ class Selman:
         self.set_to_focused(self.current_index)
 
     def proceed(self) -> None:
-        if self.sel_board[self.selection[self.current_index]]:
+        if self.is_index_selected(self.current_index):
             self.render_text_effect(TextEffect.SELECTED)
         else:
             self.render_text_effect(TextEffect.UNFOCUSED)
 
         self.terminate()
 
-    def get_opposite_mutex_index(self, target_index: int) -> int | None:
-        if self.mutex_group is None:
-            return None
-
-        opposite: int | None = None
-        for s in self.mutex_group:
-            if target_index in s:
-                opposite = next(iter(s - {target_index}))
-                break
-
-        return opposite
-
     def ban_selection_by_index(self, target_index: int, do_render: bool = True) -> None:
         if do_render:
             self.render_text_effect(TextEffect.BANNED, target_index)
-        self.sel_board[self.selection[target_index]] = False
-        self.banned_board[self.selection[target_index]] = True
+        bit = 1 << target_index
+        self._sel_mask &= ~bit
+        self._banned_mask |= bit
 
     def unban_selection_by_index(
         self, target_index: int, do_render: bool = True
     ) -> None:
         if do_render:
             self.render_text_effect(TextEffect.UNFOCUSED, target_index)
-        self.banned_board[self.selection[target_index]] = False
+        self._banned_mask &= ~(1 << target_index)
 
     def select_option(self) -> str | None:
         if not self.allow_multiple_selection:
-            self.sel_board[self.selection[self.current_index]] = True
+            self._sel_mask |= 1 << self.current_index
             self.render_text_effect(TextEffect.SELECTED)
             self.terminate()
             return self.selection[self.current_index]
 
-        current = self.sel_board[self.selection[self.current_index]]
-        if current:  # when toggle to unselect
-            self.sel_board[self.selection[self.current_index]] = False
+        bit = 1 << self.current_index
+        if self._sel_mask & bit:  # when toggle to unselect
+            self._sel_mask &= ~bit
             self.render_text_effect(TextEffect.FOCUSED)
 
-            opposite_index = self.get_opposite_mutex_index(self.current_index)
+            opposite_index = self._opposite[self.current_index]
             if opposite_index is not None and self.is_index_banned(opposite_index):
                 self.unban_selection_by_index(opposite_index)
         else:  # when toggle to select
-            self.sel_board[self.selection[self.current_index]] = True
+            self._sel_mask |= bit
             self.unban_selection_by_index(self.current_index, do_render=False)
             self.render_text_effect(TextEffect.SELECTED_FOCUSED)
 
-            opposite_index = self.get_opposite_mutex_index(self.current_index)
+            opposite_index = self._opposite[self.current_index]
             if opposite_index is not None:
                 self.ban_selection_by_index(opposite_index)
 
     def render_text_effect(
         self, effect: TextEffect, target_index: Optional[int] = None
     ):
-        ansi_control.set_col_offset(self.col_offset)
-
-        if target_index is not None and self.is_index_valid(target_index):
+        if target_index is not None and 0 <= target_index < len(self.selection):
+            index = target_index
             relative_pos = self.get_relative_pos_by_index(target_index)
-            restore = ansi_control.move_cursor_by_relative_pos_row(relative_pos)
-            try:
-                print_text_effect(self.selection[target_index], effect, self.col_offset)
-            finally:
-                restore()
+        else:
+            index = self.current_index
+            relative_pos = None
+
+        if self._drawn[index] is effect:
             return
 
-        print_text_effect(self.selection[self.current_index], effect, self.col_offset)
+        print_text_effect(
+            self._selection_bytes[index], effect, self.col_offset, relative_pos
+        )
+        self._drawn[index] = effect
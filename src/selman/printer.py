@@ -1,9 +1,9 @@
 #!/usr/bin/env python3
 from enum import Enum, auto
-import sys
-from typing import Optional, Callable
+from typing import Optional
 
 from selman import ansi_control
+from selman.ansi_control import emit
 
 FG = {
     "muted": "38;5;245",
@@ -21,91 +21,79 @@ class TextEffect(Enum):
     BANNED_FOCUSED = auto()
 
 
-def _restore_cursor_pos_col(col_offset: int):
-    ansi_control.set_col_offset(col_offset)
+FG_PREFIX = {name: f"\x1b[{code}m".encode() for name, code in FG.items()}
+FG_SUFFIX = b"\x1b[0m"
+STRIKE = b"\x1b[9m"
 
 
-def write_line(text: str, color_code: Optional[str] = None, restore_style=True):
-    """Write a text line with optional color.
-    When restore_style is True, reset SGR after the text.
-    """
-    if color_code is None:
-        sys.stdout.write(text)
-        return
-    if restore_style:
-        sys.stdout.write(f"\x1b[{color_code}m" + text + "\x1b[0m")
-        return
-    sys.stdout.write(f"\x1b[{color_code}m" + text)
-
-
-def _render_at_row(
-    relative_pos: Optional[int], col_offset: int, draw: Callable[[], None]
-) -> None:
-    """Render using draw() optionally at a relative row, then restore column."""
-    if relative_pos is not None:
-        restore_pos = ansi_control.move_cursor_by_relative_pos_row(relative_pos)
-        try:
-            draw()
-        finally:
-            restore_pos()
-            _restore_cursor_pos_col(col_offset)
-    else:
-        draw()
-        _restore_cursor_pos_col(col_offset)
-
-
-def print_unfocused(text: str, col_offset: int = 0, relative_pos: Optional[int] = None) -> None:
-    def draw():
-        write_line(f"○ {text}", FG["muted"])
-    _render_at_row(relative_pos, col_offset, draw)
-
-
-def print_focused(text: str, col_offset: int = 0, relative_pos: Optional[int] = None) -> None:
-    def draw():
-        write_line(f"● {text}", FG["accent"])
-    _render_at_row(relative_pos, col_offset, draw)
+def write_bytes(prefix: bytes, text: bytes, suffix: bytes = b"") -> None:
+    """Write already-encoded text between prefix and suffix as one chunk."""
+    emit(prefix + text + suffix)
 
 
-def print_selected(text: str, col_offset: int = 0, relative_pos: Optional[int] = None) -> None:
-    def draw():
-        write_line(f"● {text}", FG["selected"])
-    _render_at_row(relative_pos, col_offset, draw)
-
-
-def print_selected_focused(text: str, col_offset: int = 0, relative_pos: Optional[int] = None) -> None:
-    def draw():
-        write_line("● ", FG["accent"])
-        write_line(text, FG["selected"])
-    _render_at_row(relative_pos, col_offset, draw)
-
-
-def print_banned_focused(text: str, col_offset: int = 0, relative_pos: Optional[int] = None) -> None:
-    def draw():
-        write_line("\x1b[9m● ", FG["accent"], restore_style=False)
-        write_line(text + "\x1b[0m", FG["accent"], restore_style=False)
-    _render_at_row(relative_pos, col_offset, draw)
+def write_line(
+    text: str | bytes, prefix: Optional[bytes] = None, restore_style=True
+):
+    """Write a text line, optionally after a precomputed prefix such as
+    FG_PREFIX["muted"]. When restore_style is True, reset SGR after the text.
+    """
+    if isinstance(text, str):
+        text = text.encode()
+    if prefix is None:
+        emit(text)
+        return
+    write_bytes(prefix, text, FG_SUFFIX if restore_style else b"")
 
 
-def print_banned(text: str, col_offset: int = 0, relative_pos: Optional[int] = None) -> None:
-    def draw():
-        write_line(f"\x1b[9m○ {text}\x1b[29m", FG["muted"])
-    _render_at_row(relative_pos, col_offset, draw)
+GLYPH = {
+    TextEffect.UNFOCUSED: "○ ".encode(),
+    TextEffect.FOCUSED: "● ".encode(),
+    TextEffect.SELECTED: "● ".encode(),
+    TextEffect.SELECTED_FOCUSED: "● ".encode(),
+    TextEffect.BANNED: "○ ".encode(),
+    TextEffect.BANNED_FOCUSED: "● ".encode(),
+}
 
+# Everything written before and after the text for each effect.
+PREFIX = {
+    TextEffect.UNFOCUSED: FG_PREFIX["muted"] + GLYPH[TextEffect.UNFOCUSED],
+    TextEffect.FOCUSED: FG_PREFIX["accent"] + GLYPH[TextEffect.FOCUSED],
+    TextEffect.SELECTED: FG_PREFIX["selected"] + GLYPH[TextEffect.SELECTED],
+    TextEffect.SELECTED_FOCUSED: FG_PREFIX["accent"]
+    + GLYPH[TextEffect.SELECTED_FOCUSED]
+    + FG_SUFFIX
+    + FG_PREFIX["selected"],
+    TextEffect.BANNED: FG_PREFIX["muted"] + STRIKE + GLYPH[TextEffect.BANNED],
+    TextEffect.BANNED_FOCUSED: FG_PREFIX["accent"]
+    + STRIKE
+    + GLYPH[TextEffect.BANNED_FOCUSED]
+    + FG_PREFIX["accent"],
+}
 
-print_effect = {
-    TextEffect.UNFOCUSED: print_unfocused,
-    TextEffect.FOCUSED: print_focused,
-    TextEffect.SELECTED: print_selected,
-    TextEffect.SELECTED_FOCUSED: print_selected_focused,
-    TextEffect.BANNED: print_banned,
-    TextEffect.BANNED_FOCUSED: print_banned_focused,
+SUFFIX = {
+    TextEffect.UNFOCUSED: FG_SUFFIX,
+    TextEffect.FOCUSED: FG_SUFFIX,
+    TextEffect.SELECTED: FG_SUFFIX,
+    TextEffect.SELECTED_FOCUSED: FG_SUFFIX,
+    TextEffect.BANNED: b"\x1b[29m" + FG_SUFFIX,
+    TextEffect.BANNED_FOCUSED: FG_SUFFIX,
 }
 
 
 def print_text_effect(
-    text: str,
+    text: bytes,
     effect: TextEffect,
     col_offset: int = 0,
     relative_pos: Optional[int] = None,
 ) -> None:
-    print_effect[effect](text, col_offset, relative_pos)
+    """Draw encoded text with effect at col_offset, optionally at a relative row.
+    The column move, styling and column restore go out as one write.
+    """
+    col = ansi_control.col_offset_escape(col_offset)
+    line = col + PREFIX[effect] + text + SUFFIX[effect] + col
+    if relative_pos is None:
+        emit(line)
+    else:
+        undo = ansi_control.move_cursor_by_relative_pos_row(relative_pos)
+        emit(line)
+        ansi_control.move_cursor_by_relative_pos_row(undo)